@@ -0,0 +1,245 @@
+"""Admission control and load shedding for API routes."""
+import collections
+import ipaddress
+import math
+import time
+
+from starlette.responses import JSONResponse
+
+# Heavy operations allowed to run at once across the worker.
+HEAVY_CONCURRENCY = 1
+
+# Heavy operations are shed while this many reads are in flight.
+READ_PRIORITY_THRESHOLD = 32
+
+# Retry-After sent when a request is shed for capacity rather than rate.
+BUSY_RETRY_AFTER = 5
+
+# Per-client buckets kept before the least recently used are evicted.
+MAX_TRACKED_CLIENTS = 10000
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def retry_after(self):
+        """Seconds until a token is available; 0 if one is available now."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class RoutePolicy:
+    """Limits applied to one route. A rate of None disables that bucket."""
+
+    def __init__(self, route_rate=None, route_burst=1, client_rate=None, client_burst=1, heavy=False):
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.heavy = heavy
+
+
+# Keyed by (method, path). Heavy routes scrape or rewrite the whole table and
+# share the heavy slot. Reads have no per-client limit: behind a proxy that is
+# not listed in TRUSTED_PROXIES every user would share one bucket.
+ROUTE_POLICIES = {
+    ('POST', '/api/import-data'): RoutePolicy(
+        route_rate=1 / 60, route_burst=2, client_rate=1 / 300, client_burst=1, heavy=True,
+    ),
+    ('POST', '/api/clear-data'): RoutePolicy(
+        route_rate=1 / 60, route_burst=2, client_rate=1 / 300, client_burst=1, heavy=True,
+    ),
+    ('POST', '/api/snapshot/restore'): RoutePolicy(
+        route_rate=1 / 60, route_burst=2, client_rate=1 / 300, client_burst=1, heavy=True,
+    ),
+    # Downloads are rate limited but don't hold the heavy slot: it would stay
+    # taken until a slow client finished receiving the file.
+    ('GET', '/api/snapshot'): RoutePolicy(
+        route_rate=1, route_burst=5, client_rate=1 / 10, client_burst=3,
+    ),
+}
+
+# Prefixes counted as read traffic when deciding whether to shed heavy work.
+# The change feed is excluded: its connections are long-lived and idle.
+READ_PREFIXES = ('/api/sites',)
+
+
+class AdmissionController:
+    """
+    Decides whether a request may run, and keeps counters for each route.
+    Used only from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, policies=None, heavy_concurrency=HEAVY_CONCURRENCY,
+                 read_priority_threshold=READ_PRIORITY_THRESHOLD):
+        self.policies = ROUTE_POLICIES if policies is None else policies
+        self.heavy_concurrency = heavy_concurrency
+        self.read_priority_threshold = read_priority_threshold
+        self.heavy_in_flight = 0
+        self.reads_in_flight = 0
+        self._route_buckets = {}
+        self._client_buckets = collections.OrderedDict()
+        self._counters = collections.defaultdict(
+            lambda: {'admitted': 0, 'rate_limited': 0, 'shed': 0}
+        )
+
+    def _route_bucket(self, key, policy):
+        bucket = self._route_buckets.get(key)
+        if bucket is None:
+            bucket = self._route_buckets[key] = TokenBucket(policy.route_rate, policy.route_burst)
+        return bucket
+
+    def _client_bucket(self, key, client, policy):
+        bucket_key = (key, client)
+        bucket = self._client_buckets.get(bucket_key)
+        if bucket is None:
+            bucket = TokenBucket(policy.client_rate, policy.client_burst)
+            self._client_buckets[bucket_key] = bucket
+            if len(self._client_buckets) > MAX_TRACKED_CLIENTS:
+                self._client_buckets.popitem(last=False)
+        else:
+            self._client_buckets.move_to_end(bucket_key)
+        return bucket
+
+    def admit(self, method, path, client):
+        """
+        Return None if the request may proceed, otherwise a tuple of
+        (status_code, retry_after_seconds, reason).
+        """
+        key = (method, path)
+        policy = self.policies.get(key)
+        if policy is None:
+            return None
+
+        counters = self._counters[f'{method} {path}']
+
+        if policy.heavy:
+            if self.heavy_in_flight >= self.heavy_concurrency:
+                counters['shed'] += 1
+                return 503, BUSY_RETRY_AFTER, "Another heavy operation is already running."
+            if self.reads_in_flight >= self.read_priority_threshold:
+                counters['shed'] += 1
+                return 503, BUSY_RETRY_AFTER, "Server is busy serving reads."
+
+        buckets = []
+        if policy.client_rate is not None:
+            buckets.append(self._client_bucket(key, client, policy))
+        if policy.route_rate is not None:
+            buckets.append(self._route_bucket(key, policy))
+
+        # Only spend tokens once every bucket can pay.
+        retry_after = max((bucket.retry_after() for bucket in buckets), default=0)
+        if retry_after > 0:
+            counters['rate_limited'] += 1
+            return 429, retry_after, "Rate limit exceeded."
+
+        for bucket in buckets:
+            bucket.consume()
+        counters['admitted'] += 1
+        return None
+
+    def is_heavy(self, method, path):
+        policy = self.policies.get((method, path))
+        return policy is not None and policy.heavy
+
+    def stats(self):
+        return {
+            'heavy_in_flight': self.heavy_in_flight,
+            'reads_in_flight': self.reads_in_flight,
+            'tracked_clients': len(self._client_buckets),
+            'routes': {route: dict(counters) for route, counters in self._counters.items()},
+        }
+
+
+def parse_trusted_proxies(value):
+    """Parse a comma-separated list of proxy addresses or CIDR networks."""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(',') if item.strip()]
+
+
+def _is_trusted(address, trusted_proxies):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_address(scope, trusted_proxies=()):
+    """
+    Identify the client for per-client limits.
+    X-Forwarded-For is only honoured when the peer is a trusted proxy; the
+    client is the right-most forwarded address that is not itself trusted.
+    """
+    peer = scope['client'][0] if scope.get('client') else 'unknown'
+    if not trusted_proxies or not _is_trusted(peer, trusted_proxies):
+        return peer
+
+    forwarded = []
+    for name, value in scope.get('headers', []):
+        if name == b'x-forwarded-for':
+            forwarded.extend(part.strip() for part in value.decode('latin-1').split(','))
+
+    for address in reversed(forwarded):
+        if address and not _is_trusted(address, trusted_proxies):
+            return address
+    return peer
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that rejects requests the controller does not admit."""
+
+    def __init__(self, app, controller, trusted_proxies=()):
+        self.app = app
+        self.controller = controller
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        path = scope['path']
+        client = client_address(scope, self.trusted_proxies)
+
+        rejection = self.controller.admit(method, path, client)
+        if rejection is not None:
+            status_code, retry_after, reason = rejection
+            response = JSONResponse(
+                {'success': False, 'error': reason},
+                status_code=status_code,
+                headers={'Retry-After': str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        heavy = self.controller.is_heavy(method, path)
+        read = method == 'GET' and path.startswith(READ_PREFIXES)
+        if heavy:
+            self.controller.heavy_in_flight += 1
+        elif read:
+            self.controller.reads_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if heavy:
+                self.controller.heavy_in_flight -= 1
+            elif read:
+                self.controller.reads_in_flight -= 1
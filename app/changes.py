@@ -0,0 +1,110 @@
+"""In-process change feed for pushing site writes to connected clients."""
+import asyncio
+import collections
+import itertools
+import threading
+import uuid
+
+# Number of recent changes kept for clients catching up with ?since=.
+CHANGE_LOG_SIZE = 1000
+
+
+class ChangeFeed:
+    """
+    Versioned log of site writes with cheap fan-out to async waiters.
+
+    Writers call publish() from any thread. Waiters share a single
+    asyncio.Event per version bump, so an idle connection costs one
+    pending wait rather than a queue of its own.
+    """
+
+    def __init__(self, max_changes=CHANGE_LOG_SIZE):
+        # Versions restart with the process; the epoch tells clients when
+        # their cursor belongs to a previous run.
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self._changes = collections.deque(maxlen=max_changes)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._event = None
+        self._wake_pending = False
+
+    def publish(self, op, site_id=None, site=None):
+        """Append a change and wake any waiting clients. Returns its version."""
+        with self._lock:
+            self.version += 1
+            version = self.version
+            self._changes.append({
+                'version': version,
+                'op': op,
+                'id': str(site_id) if site_id is not None else None,
+                'site': site,
+            })
+
+            loop = self._loop
+            schedule_wake = loop is not None and not self._wake_pending
+            if schedule_wake:
+                self._wake_pending = True
+
+        if schedule_wake:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:
+                # The event loop has shut down; nobody is waiting on it anymore.
+                with self._lock:
+                    if self._loop is loop:
+                        self._loop = None
+                        self._event = None
+                    self._wake_pending = False
+        return version
+
+    def changes_since(self, version, epoch=None):
+        """
+        Return the changes after version, oldest first.
+        Returns None when the client must reload the full dataset instead:
+        the cursor is from another epoch or has fallen out of the log.
+        """
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return None
+            if version > self.version or version < 0:
+                return None
+            if version == self.version:
+                return []
+            if not self._changes or self._changes[0]['version'] > version + 1:
+                return None
+
+            start = version + 1 - self._changes[0]['version']
+            return list(itertools.islice(self._changes, start, None))
+
+    async def wait(self, version, timeout):
+        """Wait until the feed moves past version. Returns False on timeout."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                # First waiter, or the previous loop has been replaced (e.g. a
+                # new server or test client); events are bound to one loop.
+                self._loop = loop
+                self._event = asyncio.Event()
+                self._wake_pending = False
+            if self.version > version:
+                return True
+            event = self._event
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _wake(self, loop):
+        with self._lock:
+            if self._loop is not loop:
+                # Rebound to another loop since this wake was scheduled.
+                return
+            self._wake_pending = False
+            event, self._event = self._event, asyncio.Event()
+        event.set()
+
+
+change_feed = ChangeFeed()
@@ -1,12 +1,47 @@
+import itertools
 import os
 import logging
 import sqlite3
 from abc import ABC, abstractmethod
 
+from app.changes import change_feed
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Columns populated by the scraper and written during bulk imports.
+SITE_COLUMNS = (
+    'site_code',
+    'name',
+    'state',
+    'latitude',
+    'longitude',
+    'description',
+    'site_type',
+    'status',
+    'wiki_url',
+)
+
+IMPORT_BATCH_SIZE = 500
+
+SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS nike_sites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    site_code TEXT NOT NULL,
+    name TEXT,
+    state TEXT,
+    latitude REAL,
+    longitude REAL,
+    description TEXT,
+    site_type TEXT,
+    status TEXT,
+    wiki_url TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
 
 class DatabaseAdapter(ABC):
     """Abstract base class for database adapters."""
@@ -39,6 +74,10 @@ class DatabaseAdapter(ABC):
     def import_sites(self, sites):
         pass
 
+    def publish_change(self, op, site_id=None, site=None):
+        """Record a write in the change feed for connected clients."""
+        return change_feed.publish(op, site_id, site)
+
 
 class InMemoryAdapter(DatabaseAdapter):
     """In-memory adapter for ephemeral deployments."""
@@ -73,12 +112,14 @@ class InMemoryAdapter(DatabaseAdapter):
 
         site_data['id'] = new_id
         InMemoryAdapter._sites.append(site_data)
+        self.publish_change('insert', new_id, site_data.copy())
         return new_id
 
     def update_site(self, site_id, site_data):
         for i, site in enumerate(InMemoryAdapter._sites):
             if str(site.get('id')) == str(site_id):
                 InMemoryAdapter._sites[i].update(site_data)
+                self.publish_change('update', site_id, InMemoryAdapter._sites[i].copy())
                 return True
         return False
 
@@ -86,18 +127,21 @@ class InMemoryAdapter(DatabaseAdapter):
         for i, site in enumerate(InMemoryAdapter._sites):
             if str(site.get('id')) == str(site_id):
                 InMemoryAdapter._sites.pop(i)
+                self.publish_change('delete', site_id)
                 return True
         return False
 
     def import_sites(self, sites):
-        InMemoryAdapter._sites = []
+        imported = []
         for i, site in enumerate(sites):
             site_copy = site.copy()
             site_copy['id'] = str(i + 1)
-            InMemoryAdapter._sites.append(site_copy)
+            imported.append(site_copy)
 
-        logger.info("Imported %s sites into In-Memory database", len(sites))
-        return len(sites)
+        InMemoryAdapter._sites = imported
+        self.publish_change('reset')
+        logger.info("Imported %s sites into In-Memory database", len(imported))
+        return len(imported)
 
 
 class SQLiteAdapter(DatabaseAdapter):
@@ -128,22 +172,7 @@ class SQLiteAdapter(DatabaseAdapter):
         conn = self.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS nike_sites (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            site_code TEXT NOT NULL,
-            name TEXT,
-            state TEXT,
-            latitude REAL,
-            longitude REAL,
-            description TEXT,
-            site_type TEXT,
-            status TEXT,
-            wiki_url TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        cursor.execute(SCHEMA_SQL)
 
         conn.commit()
         conn.close()
@@ -179,6 +208,7 @@ class SQLiteAdapter(DatabaseAdapter):
         site_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        self.publish_change('insert', site_id, self.get_site_by_id(site_id))
         return site_id
 
     def update_site(self, site_id, site_data):
@@ -194,6 +224,8 @@ class SQLiteAdapter(DatabaseAdapter):
         conn.commit()
         rowcount = cursor.rowcount
         conn.close()
+        if rowcount > 0:
+            self.publish_change('update', site_id, self.get_site_by_id(site_id))
         return rowcount > 0
 
     def delete_site(self, site_id):
@@ -205,26 +237,40 @@ class SQLiteAdapter(DatabaseAdapter):
         conn.commit()
         rowcount = cursor.rowcount
         conn.close()
+        if rowcount > 0:
+            self.publish_change('delete', site_id)
         return rowcount > 0
 
-    def import_sites(self, sites):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('DELETE FROM nike_sites')
-
-        for site in sites:
-            columns = ', '.join(site.keys())
-            placeholders = ', '.join(['?' for _ in site])
-            values = tuple(site.values())
-            query = f'INSERT INTO nike_sites ({columns}) VALUES ({placeholders})'
-            cursor.execute(query, values)
-
-        conn.commit()
-        conn.close()
+    def import_sites(self, sites, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Replace all sites with the given iterable in a single transaction.
+        Rows are written with executemany in batches, so generators are
+        consumed incrementally instead of being materialized up front.
+        """
+        columns = ', '.join(SITE_COLUMNS)
+        placeholders = ', '.join(['?' for _ in SITE_COLUMNS])
+        query = f'INSERT INTO nike_sites ({columns}) VALUES ({placeholders})'
 
-        logger.info("Imported %s sites into SQLite database", len(sites))
-        return len(sites)
+        conn = self.get_connection()
+        count = 0
+        try:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM nike_sites')
+
+                rows = (tuple(site.get(column) for column in SITE_COLUMNS) for site in sites)
+                while True:
+                    batch = list(itertools.islice(rows, batch_size))
+                    if not batch:
+                        break
+                    cursor.executemany(query, batch)
+                    count += len(batch)
+        finally:
+            conn.close()
+
+        self.publish_change('reset')
+        logger.info("Imported %s sites into SQLite database", count)
+        return count
 
 
 def get_db():
@@ -0,0 +1,108 @@
+"""Streaming stages between the scraper and the database adapters."""
+import itertools
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class PipelineStats:
+    """Per-stage counters for a single scrape-to-database run."""
+
+    def __init__(self):
+        self.scraped = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.accepted = 0
+
+    def as_dict(self):
+        return {
+            'scraped': self.scraped,
+            'invalid': self.invalid,
+            'duplicates': self.duplicates,
+            'accepted': self.accepted,
+        }
+
+
+def is_valid_site(site):
+    """Check that a site has a code and coordinates inside the valid range."""
+    site_code = site.get('site_code')
+    if not isinstance(site_code, str) or not site_code:
+        return False
+
+    latitude = site.get('latitude')
+    longitude = site.get('longitude')
+    for value in (latitude, longitude):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+
+    return -90 <= latitude <= 90 and -180 <= longitude <= 180
+
+
+def site_key(site):
+    """Identity used to detect the same site listed more than once."""
+    return (
+        site['site_code'].lower(),
+        round(site['latitude'], 5),
+        round(site['longitude'], 5),
+    )
+
+
+def process_sites(sites, stats=None):
+    """
+    Validate and deduplicate a stream of scraped sites.
+    Only the keys of accepted sites are retained, so memory stays bounded
+    by the number of distinct sites rather than the size of the page.
+    """
+    if stats is None:
+        stats = PipelineStats()
+
+    seen = set()
+    for site in sites:
+        stats.scraped += 1
+
+        if not is_valid_site(site):
+            stats.invalid += 1
+            continue
+
+        key = site_key(site)
+        if key in seen:
+            stats.duplicates += 1
+            continue
+
+        seen.add(key)
+        stats.accepted += 1
+        yield site
+
+
+def prefetch(iterable):
+    """
+    Pull the first item from a stream so callers can tell whether it is empty
+    before starting a destructive import.
+    Returns None for an empty stream, otherwise an equivalent iterator.
+    """
+    iterator = iter(iterable)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return None
+    return itertools.chain((first,), iterator)
+
+
+def run_import(db_adapter, sites, stats=None):
+    """
+    Stream sites through the pipeline into a database adapter.
+    Returns the number of imported sites, or 0 without touching the
+    database when the stream produced nothing.
+    """
+    if stats is None:
+        stats = PipelineStats()
+
+    stream = prefetch(process_sites(sites, stats))
+    if stream is None:
+        logger.warning("Pipeline produced no sites: %s", stats.as_dict())
+        return 0
+
+    imported_count = db_adapter.import_sites(stream)
+    logger.info("Pipeline finished: %s", stats.as_dict())
+    return imported_count
@@ -1,5 +1,3 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 import logging
 
@@ -79,13 +77,75 @@ def is_us_state(state_name):
     # Check if it's in our list of US states/territories
     return any(state.lower() in clean_state.lower() for state in us_states)
 
-def scrape_nike_sites():
+WIKI_URL = "https://en.wikipedia.org/wiki/List_of_Nike_missile_sites"
+
+# Elements kept from the page when parsing: state headings and site tables.
+SCRAPED_TAGS = ['h2', 'h3', 'h4', 'table']
+
+
+def parse_site_row(row, state, url):
     """
-    Scrape Nike missile site data from Wikipedia.
-    Returns a list of dictionaries with site information.
-    Focus on US sites only.
+    Parse a single table row into a site dictionary.
+    Returns None for rows without usable coordinates.
+    """
+    cells = row.find_all(['td', 'th'])
+    
+    # Skip rows with insufficient data
+    if len(cells) < 3:
+        return None
+    
+    # Extract site information (column structure may vary)
+    site_code = cells[0].get_text().strip()
+    site_name = cells[1].get_text().strip() if len(cells) > 1 else ""
+    
+    # Look for coordinates in any cell
+    coordinates = None
+    description = ""
+    
+    for cell in cells:
+        # Check for coordinates
+        coord_span = cell.find('span', class_='geo')
+        if coord_span:
+            coordinates = coord_span.get_text().strip()
+        
+        # Collect text as potential description
+        cell_text = cell.get_text().strip()
+        if cell_text and len(cell_text) > len(description):
+            description = cell_text
+    
+    # Skip entries without coordinates
+    if not coordinates:
+        return None
+    
+    # Extract latitude and longitude
+    latitude, longitude = extract_coordinates(coordinates)
+    
+    if latitude is None or longitude is None:
+        return None
+    
+    return {
+        'site_code': site_code,
+        'name': site_name,
+        'state': state,
+        'latitude': latitude,
+        'longitude': longitude,
+        'description': description,
+        'site_type': "Unknown",  # Would need more parsing to determine
+        'status': "Unknown",     # Would need more parsing to determine
+        'wiki_url': url
+    }
+
+def iter_nike_sites(url=WIKI_URL):
+    """
+    Scrape Nike missile site data from Wikipedia, one state table at a time.
+    Yields dictionaries with site information for US sites only.
+    Each table is released from the parse tree once its sites are yielded,
+    so consumers can stream results without holding every site in memory.
     """
-    url = "https://en.wikipedia.org/wiki/List_of_Nike_missile_sites"
+    # Scraping is rare; keep requests and bs4 out of the app's import path.
+    import requests
+    from bs4 import BeautifulSoup, SoupStrainer
+    
     logger.info(f"Fetching data from {url}")
     
     try:
@@ -98,95 +158,64 @@ def scrape_nike_sites():
         response = requests.get(url, headers=headers, timeout=30)
         response.raise_for_status()  # Raise exception for HTTP errors
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        sites = []
+        # Only build the headings (for state names) and tables; the rest of
+        # the page (navigation, references, scripts) never enters the tree.
+        soup = BeautifulSoup(response.text, 'html.parser', parse_only=SoupStrainer(SCRAPED_TAGS))
+        del response
         
         # Find all tables with class wikitable
         tables = soup.find_all('table', class_='wikitable')
+    except Exception as e:
+        logger.error(f"Error scraping Nike sites: {str(e)}")
+        return
+    
+    total = 0
+    
+    # Process each table (each state has its own table)
+    for table in tables:
+        # Try to find the state name from the preceding heading
+        state_heading = table.find_previous(['h2', 'h3', 'h4'])
+        state = state_heading.get_text().strip() if state_heading else "Unknown"
         
-        # Process each table (each state has its own table)
-        for table in tables:
-            # Try to find the state name from the preceding heading
-            state_heading = table.find_previous(['h2', 'h3', 'h4'])
-            state = state_heading.get_text().strip() if state_heading else "Unknown"
-            
-            # Remove any "[edit]" text that might be in the heading
-            state = re.sub(r'\[\w+\]', '', state).strip()
-            
-            # Skip non-US states
-            if not is_us_state(state):
-                logger.info(f"Skipping non-US location: {state}")
+        # Remove any "[edit]" text that might be in the heading
+        state = re.sub(r'\[\w+\]', '', state).strip()
+        
+        # Skip non-US states
+        if not is_us_state(state):
+            logger.debug(f"Skipping non-US location: {state}")
+            table.decompose()
+            continue
+        
+        count = 0
+        
+        # Skip header row
+        for row in table.find_all('tr')[1:]:
+            try:
+                site = parse_site_row(row, state, url)
+            except Exception as e:
+                logger.error(f"Error processing row: {str(e)}")
                 continue
-                
-            logger.info(f"Processing sites for US state: {state}")
             
-            # Process rows in the table
-            rows = table.find_all('tr')
+            if site is None:
+                continue
             
-            # Skip header row
-            for row in rows[1:]:
-                cells = row.find_all(['td', 'th'])
-                
-                # Skip rows with insufficient data
-                if len(cells) < 3:
-                    continue
-                
-                try:
-                    # Extract site information (column structure may vary)
-                    site_code = cells[0].get_text().strip()
-                    site_name = cells[1].get_text().strip() if len(cells) > 1 else ""
-                    
-                    # Look for coordinates in any cell
-                    coordinates = None
-                    description = ""
-                    
-                    for cell in cells:
-                        # Check for coordinates
-                        coord_span = cell.find('span', class_='geo')
-                        if coord_span:
-                            coordinates = coord_span.get_text().strip()
-                        
-                        # Collect text as potential description
-                        cell_text = cell.get_text().strip()
-                        if cell_text and len(cell_text) > len(description):
-                            description = cell_text
-                    
-                    # Skip entries without coordinates
-                    if not coordinates:
-                        continue
-                    
-                    # Extract latitude and longitude
-                    latitude, longitude = extract_coordinates(coordinates)
-                    
-                    if latitude is None or longitude is None:
-                        continue
-                    
-                    # Create site entry
-                    site = {
-                        'site_code': site_code,
-                        'name': site_name,
-                        'state': state,
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'description': description,
-                        'site_type': "Unknown",  # Would need more parsing to determine
-                        'status': "Unknown",     # Would need more parsing to determine
-                        'wiki_url': url
-                    }
-                    
-                    sites.append(site)
-                    logger.info(f"Extracted site: {site_code} - {site_name}")
-                
-                except Exception as e:
-                    logger.error(f"Error processing row: {str(e)}")
-                    continue
+            logger.debug(f"Extracted site: {site['site_code']} - {site['name']}")
+            count += 1
+            yield site
         
-        logger.info(f"Extracted {len(sites)} Nike missile sites")
-        return sites
+        logger.info(f"Processed {count} sites for US state: {state}")
+        total += count
+        table.decompose()
     
-    except Exception as e:
-        logger.error(f"Error scraping Nike sites: {str(e)}")
-        return []
+    logger.info(f"Extracted {total} Nike missile sites")
+
+def scrape_nike_sites():
+    """
+    Scrape Nike missile site data from Wikipedia.
+    Returns a list of dictionaries with site information.
+    Focus on US sites only.
+    """
+    return list(iter_nike_sites())
 
 if __name__ == "__main__":
     # Test the scraper
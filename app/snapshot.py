@@ -0,0 +1,226 @@
+"""Portable, versioned snapshots of the site dataset."""
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from app.database import SCHEMA_SQL, SITE_COLUMNS, SQLiteAdapter
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_NAME = 'nike-sites'
+SNAPSHOT_VERSION = 1
+
+# File suffix for each supported snapshot format. Both are gzip-compressed.
+SNAPSHOT_SUFFIXES = {
+    'sqlite': '.db.gz',
+    'ndjson': '.ndjson.gz',
+}
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be written or read."""
+
+
+def snapshot_format(path):
+    """Infer the snapshot format from the file name."""
+    for fmt, suffix in SNAPSHOT_SUFFIXES.items():
+        if path.endswith(suffix):
+            return fmt
+    raise SnapshotError(f"Unrecognized snapshot file: {path}")
+
+
+def export_snapshot(db_adapter, path, fmt=None):
+    """
+    Write the adapter's sites to a compressed snapshot at path.
+    The file is replaced atomically, so readers never see a partial snapshot.
+    Returns the number of exported sites.
+    """
+    fmt = fmt or snapshot_format(path)
+    if fmt not in SNAPSHOT_SUFFIXES:
+        raise SnapshotError(f"Unsupported snapshot format: {fmt}")
+
+    snapshot_dir = os.path.dirname(path)
+    if snapshot_dir:
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    tmp_path = f'{path}.tmp'
+    try:
+        if fmt == 'sqlite':
+            count = _export_sqlite(db_adapter, tmp_path)
+        else:
+            count = _export_ndjson(db_adapter, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info("Exported %s sites to %s snapshot at %s", count, fmt, path)
+    return count
+
+
+def restore_snapshot(db_adapter, path):
+    """
+    Replace the adapter's sites with the contents of a snapshot.
+    Returns the number of restored sites.
+    """
+    fmt = snapshot_format(path)
+    try:
+        if fmt == 'sqlite':
+            count = _restore_sqlite(db_adapter, path)
+        else:
+            count = _restore_ndjson(db_adapter, path)
+    except (sqlite3.DatabaseError, ValueError, EOFError, OSError) as exc:
+        # Corrupt gzip, SQLite or JSON data; the restore has been rolled back.
+        raise SnapshotError(f"Could not restore snapshot {path}: {exc}") from exc
+
+    logger.info("Restored %s sites from %s snapshot at %s", count, fmt, path)
+    return count
+
+
+def _insert_query():
+    columns = ', '.join(SITE_COLUMNS)
+    placeholders = ', '.join(['?' for _ in SITE_COLUMNS])
+    return f'INSERT INTO nike_sites ({columns}) VALUES ({placeholders})'
+
+
+def _temp_db_path():
+    fd, raw_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return raw_path
+
+
+def _export_sqlite(db_adapter, path):
+    raw_path = _temp_db_path()
+    try:
+        dst = sqlite3.connect(raw_path)
+        try:
+            if isinstance(db_adapter, SQLiteAdapter):
+                # The online backup API copies a consistent image of the live
+                # database without blocking readers.
+                src = db_adapter.get_connection()
+                try:
+                    src.backup(dst)
+                finally:
+                    src.close()
+            else:
+                dst.execute(SCHEMA_SQL)
+                rows = (
+                    tuple(site.get(column) for column in SITE_COLUMNS)
+                    for site in db_adapter.get_all_sites()
+                )
+                dst.executemany(_insert_query(), rows)
+
+            dst.execute(f'PRAGMA user_version = {SNAPSHOT_VERSION}')
+            dst.commit()
+            count = dst.execute('SELECT COUNT(*) FROM nike_sites').fetchone()[0]
+        finally:
+            dst.close()
+
+        with open(raw_path, 'rb') as raw_file, gzip.open(path, 'wb') as out:
+            shutil.copyfileobj(raw_file, out)
+    finally:
+        os.remove(raw_path)
+
+    return count
+
+
+def _snapshot_columns(conn, schema='main'):
+    """
+    Check that a snapshot database has the expected version and table.
+    Returns the nike_sites columns to copy, keeping ids and timestamps.
+    """
+    version = conn.execute(f'PRAGMA {schema}.user_version').fetchone()[0]
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version: {version}")
+
+    columns = [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info(nike_sites)')]
+    missing = [column for column in SITE_COLUMNS if column not in columns]
+    if missing:
+        raise SnapshotError(f"Snapshot is missing nike_sites columns: {', '.join(missing)}")
+
+    return [column for column in ('id',) + SITE_COLUMNS + ('created_at', 'updated_at') if column in columns]
+
+
+def _restore_sqlite(db_adapter, path):
+    raw_path = _temp_db_path()
+    try:
+        with gzip.open(path, 'rb') as snapshot_file, open(raw_path, 'wb') as raw_file:
+            shutil.copyfileobj(snapshot_file, raw_file)
+
+        if isinstance(db_adapter, SQLiteAdapter):
+            count = _restore_sqlite_into_sqlite(db_adapter, raw_path)
+            db_adapter.publish_change('reset')
+        else:
+            src = sqlite3.connect(raw_path)
+            try:
+                columns = _snapshot_columns(src)
+                src.row_factory = sqlite3.Row
+                cursor = src.execute(f'SELECT {", ".join(columns)} FROM nike_sites')
+                count = db_adapter.import_sites(dict(row) for row in cursor)
+            finally:
+                src.close()
+    finally:
+        os.remove(raw_path)
+
+    return count
+
+
+def _restore_sqlite_into_sqlite(db_adapter, raw_path):
+    # Copy rows from the attached snapshot in one transaction, so a bad
+    # snapshot rolls back instead of replacing the live database file.
+    conn = db_adapter.get_connection()
+    try:
+        conn.execute('ATTACH DATABASE ? AS snapshot', (raw_path,))
+        try:
+            columns = ', '.join(_snapshot_columns(conn, 'snapshot'))
+            with conn:
+                conn.execute('DELETE FROM nike_sites')
+                conn.execute(
+                    f'INSERT INTO nike_sites ({columns}) SELECT {columns} FROM snapshot.nike_sites'
+                )
+            count = conn.execute('SELECT COUNT(*) FROM nike_sites').fetchone()[0]
+        finally:
+            conn.execute('DETACH DATABASE snapshot')
+    finally:
+        conn.close()
+
+    return count
+
+
+def _export_ndjson(db_adapter, path):
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as out:
+        header = {'format': SNAPSHOT_NAME, 'version': SNAPSHOT_VERSION, 'columns': list(SITE_COLUMNS)}
+        out.write(json.dumps(header) + '\n')
+        for site in db_adapter.get_all_sites():
+            out.write(json.dumps({column: site.get(column) for column in SITE_COLUMNS}) + '\n')
+            count += 1
+    return count
+
+
+def _restore_ndjson(db_adapter, path):
+    with gzip.open(path, 'rt', encoding='utf-8') as snapshot_file:
+        try:
+            header = json.loads(snapshot_file.readline())
+        except ValueError as exc:
+            raise SnapshotError(f"Invalid snapshot header in {path}") from exc
+
+        if not isinstance(header, dict) or header.get('format') != SNAPSHOT_NAME:
+            raise SnapshotError(f"Not a {SNAPSHOT_NAME} snapshot: {path}")
+        if header.get('version') != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version: {header.get('version')}")
+
+        sites = (_decode_site(line) for line in snapshot_file if line.strip())
+        return db_adapter.import_sites(sites)
+
+
+def _decode_site(line):
+    site = json.loads(line)
+    if not isinstance(site, dict):
+        raise SnapshotError("Snapshot rows must be JSON objects")
+    return site
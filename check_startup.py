@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import argparse
+import subprocess
+import sys
+
+# Modules that only the scraper needs; importing the app must not load them.
+LAZY_MODULES = ('requests', 'bs4')
+
+# The framework's own import cost is outside our control and varies a lot
+# between machines, so the budget covers what the app adds on top of it.
+FRAMEWORK_MODULE = 'fastapi'
+
+# Import cost of main beyond fastapi, best of several runs. Measured at
+# ~250-270 ms with the scraper stack imported eagerly and ~105-135 ms
+# with it loaded lazily.
+STARTUP_BUDGET_MS = 175
+
+def measure_import(module):
+    """Import a module in a fresh interpreter and return {name: cumulative_ms} for every module loaded"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header row
+        timings[fields[2].strip()] = int(fields[1]) / 1000
+
+    if module not in timings:
+        raise RuntimeError(f"{module} was not imported in a fresh interpreter")
+    return timings
+
+def app_import_cost(timings, module='main'):
+    """Cumulative import time of module minus the framework it builds on"""
+    return timings[module] - timings.get(FRAMEWORK_MODULE, 0)
+
+def eager_modules(timings):
+    """Scraper dependencies that were loaded at import"""
+    return sorted(name for name in timings if name.split('.')[0] in LAZY_MODULES)
+
+def main():
+    """Check that importing the app stays within its startup budget"""
+    parser = argparse.ArgumentParser(description="Measure app import time with python -X importtime")
+    parser.add_argument('--module', default='main', help="Module to import (default: main)")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Maximum import cost beyond {FRAMEWORK_MODULE}")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to sample; the best run is used")
+    args = parser.parse_args()
+
+    samples = [measure_import(args.module) for _ in range(args.runs)]
+    best = min(samples, key=lambda timings: app_import_cost(timings, args.module))
+    cost_ms = app_import_cost(best, args.module)
+    print(f"import {args.module}: {best[args.module]:.1f} ms total, {cost_ms:.1f} ms beyond "
+          f"{FRAMEWORK_MODULE} (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = eager_modules(best)
+    if eager:
+        print(f"FAIL: scraper dependencies loaded at import: {', '.join(eager)}")
+        failed = True
+    if cost_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,9 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-key-please-change-in-production')
     DATABASE_PATH = os.environ.get('DATABASE_PATH', 'nike_sites.db')
     GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', '')
+    SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', '')
+    # Reverse proxies whose X-Forwarded-For is trusted (comma-separated IPs or CIDRs).
+    TRUSTED_PROXIES = os.environ.get('TRUSTED_PROXIES', '')
     DEBUG = False
     TESTING = False
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import argparse
+import collections
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+def request(url, method='GET'):
+    """Send one request and return (status_code, latency_ms)"""
+    req = urllib.request.Request(url, method=method, data=b'' if method == 'POST' else None)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except OSError:
+        status = 0
+    return status, (time.perf_counter() - start) * 1000
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+    """Hammer the read endpoint while firing heavy writes, then report admission results"""
+    parser = argparse.ArgumentParser(description="Local load test for admission control")
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run")
+    parser.add_argument('--readers', type=int, default=20, help="Concurrent GET /api/sites loops")
+    parser.add_argument('--writers', type=int, default=4, help="Concurrent heavy-write loops")
+    parser.add_argument('--write-path', default='/api/import-data', help="Heavy POST endpoint to exercise")
+    args = parser.parse_args()
+
+    results = collections.defaultdict(list)
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker(kind, url, method):
+        while time.monotonic() < deadline:
+            status, latency = request(url, method)
+            with lock:
+                results[kind].append((status, latency))
+            if kind == 'write':
+                time.sleep(0.5)
+
+    threads = [
+        threading.Thread(target=worker, args=('read', f'{args.base_url}/api/sites', 'GET'))
+        for _ in range(args.readers)
+    ] + [
+        threading.Thread(target=worker, args=('write', f'{args.base_url}{args.write_path}', 'POST'))
+        for _ in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for kind in ('read', 'write'):
+        samples = results[kind]
+        statuses = collections.Counter(status for status, _ in samples)
+        ok_latencies = [latency for status, latency in samples if status == 200]
+        rejected_latencies = [latency for status, latency in samples if status in (429, 503)]
+        print(f"{kind}: {len(samples)} requests, statuses {dict(sorted(statuses.items()))}")
+        print(f"  200 latency p50 {percentile(ok_latencies, 50):.1f} ms, p99 {percentile(ok_latencies, 99):.1f} ms")
+        if rejected_latencies:
+            print(f"  rejection latency p50 {percentile(rejected_latencies, 50):.1f} ms")
+
+    try:
+        with urllib.request.urlopen(f'{args.base_url}/api/admission', timeout=10) as response:
+            print(json.dumps(json.load(response), indent=2))
+    except OSError as e:
+        print(f"Could not fetch admission counters: {str(e)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
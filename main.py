@@ -1,26 +1,65 @@
 import datetime
+import json
 import logging
 import os
+import tempfile
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.background import BackgroundTask
 
+from app.admission import AdmissionController, AdmissionMiddleware, parse_trusted_proxies
+from app.changes import change_feed
 from app.database import get_db
-from app.scraper import scrape_nike_sites
+from app.pipeline import PipelineStats, run_import
+from app.scraper import iter_nike_sites
+from app.snapshot import SNAPSHOT_SUFFIXES, SnapshotError, export_snapshot, restore_snapshot
 from config import get_config
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 config = get_config()
+
+# Idle SSE connections get a comment this often so proxies keep them open.
+SSE_HEARTBEAT_SECONDS = 15
+
+# How long a dropped EventSource waits before reconnecting.
+SSE_RETRY_MS = 1000
+
 app = FastAPI(title="Nike Missile Base Map")
 
+admission = AdmissionController()
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    trusted_proxies=parse_trusted_proxies(getattr(config, "TRUSTED_PROXIES", "")),
+)
+
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
 
+def restore_configured_snapshot(db_adapter) -> int:
+    snapshot_path = getattr(config, "SNAPSHOT_PATH", "")
+    if not snapshot_path:
+        return 0
+    if not os.path.exists(snapshot_path):
+        logger.warning("Snapshot %s not found; falling back to scraping.", snapshot_path)
+        return 0
+
+    try:
+        restored_count = restore_snapshot(db_adapter, snapshot_path)
+    except (SnapshotError, OSError) as exc:
+        logger.error("Error restoring snapshot %s: %s", snapshot_path, exc)
+        return 0
+
+    logger.info("Restored %s Nike missile sites from snapshot on startup.", restored_count)
+    return restored_count
+
+
 @app.on_event("startup")
 def startup() -> None:
     try:
@@ -29,16 +68,15 @@ def startup() -> None:
         logger.info("Database initialized successfully")
 
         sites = db_adapter.get_all_sites()
-        if not sites:
+        if sites:
+            logger.info("Found %s Nike missile sites in database.", len(sites))
+        elif not restore_configured_snapshot(db_adapter):
             logger.info("No Nike missile sites found in database. Loading data automatically...")
-            sites_data = scrape_nike_sites()
-            if sites_data:
-                imported_count = db_adapter.import_sites(sites_data)
+            imported_count = run_import(db_adapter, iter_nike_sites())
+            if imported_count:
                 logger.info("Successfully imported %s Nike missile sites on startup.", imported_count)
             else:
                 logger.warning("No data found during automatic scraping.")
-        else:
-            logger.info("Found %s Nike missile sites in database.", len(sites))
     except Exception as exc:
         logger.error("Error initializing database: %s", exc)
 
@@ -75,8 +113,15 @@ def about(request: Request) -> HTMLResponse:
 def get_sites(
     state: str | None = Query(default=None),
     site_type: str | None = Query(default=None),
+    since: int | None = Query(default=None),
+    epoch: str | None = Query(default=None),
 ) -> JSONResponse:
+    if since is not None:
+        return get_site_changes(since, epoch)
+
     try:
+        # Read the version before the sites: replaying later changes is idempotent.
+        version = change_feed.version
         db_adapter = get_db()
         sites = db_adapter.get_all_sites()
 
@@ -86,12 +131,102 @@ def get_sites(
         if site_type:
             sites = [site for site in sites if site.get("site_type") == site_type]
 
-        return JSONResponse({"success": True, "count": len(sites), "sites": sites})
+        return JSONResponse(
+            {
+                "success": True,
+                "count": len(sites),
+                "sites": sites,
+                "epoch": change_feed.epoch,
+                "version": version,
+            }
+        )
     except Exception as exc:
         logger.error("Error retrieving sites: %s", exc)
         return JSONResponse({"success": False, "error": str(exc)}, status_code=500)
 
 
+def get_site_changes(since: int, epoch: str | None) -> JSONResponse:
+    version = change_feed.version
+    changes = change_feed.changes_since(since, epoch)
+    if changes is None or any(change["op"] == "reset" for change in changes):
+        return JSONResponse(
+            {"success": True, "reset": True, "epoch": change_feed.epoch, "version": version}
+        )
+
+    return JSONResponse(
+        {
+            "success": True,
+            "reset": False,
+            "epoch": change_feed.epoch,
+            "version": changes[-1]["version"] if changes else since,
+            "changes": changes,
+        }
+    )
+
+
+def parse_event_id(event_id: str | None) -> tuple[str | None, int | None]:
+    if not event_id:
+        return None, None
+    epoch, _, version = event_id.rpartition(":")
+    try:
+        return epoch or None, int(version)
+    except ValueError:
+        return None, None
+
+
+def format_event(event: str, data: dict, event_id: str | None = None) -> str:
+    lines = [f"event: {event}", f"data: {json.dumps(data)}"]
+    if event_id:
+        lines.insert(0, f"id: {event_id}")
+    return "\n".join(lines) + "\n\n"
+
+
+@app.get("/api/changes")
+async def stream_changes(
+    request: Request,
+    since: int | None = Query(default=None),
+    epoch: str | None = Query(default=None),
+) -> StreamingResponse:
+    # EventSource reconnects with Last-Event-ID, which takes precedence.
+    header_epoch, header_since = parse_event_id(request.headers.get("last-event-id"))
+    if header_since is not None:
+        epoch, since = header_epoch, header_since
+
+    async def events():
+        cursor = change_feed.version if since is None else since
+        cursor_epoch = epoch
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+
+        while True:
+            changes = change_feed.changes_since(cursor, cursor_epoch)
+            cursor_epoch = change_feed.epoch
+            if changes is None:
+                # The client's view can't be patched; tell it to reload.
+                cursor = change_feed.version
+                yield format_event(
+                    "reset",
+                    {"epoch": change_feed.epoch, "version": cursor},
+                    f"{change_feed.epoch}:{cursor}",
+                )
+                changes = []
+
+            for change in changes:
+                cursor = change["version"]
+                event = "reset" if change["op"] == "reset" else "change"
+                yield format_event(event, change, f"{change_feed.epoch}:{cursor}")
+
+            if await request.is_disconnected():
+                break
+            if not await change_feed.wait(cursor, SSE_HEARTBEAT_SECONDS):
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/sites/{site_id}")
 def get_site(site_id: str) -> JSONResponse:
     try:
@@ -115,18 +250,23 @@ def import_data() -> JSONResponse:
         db_adapter = get_db()
         db_adapter.initialize()
 
-        sites_data = scrape_nike_sites()
-        if not sites_data:
+        stats = PipelineStats()
+        imported_count = run_import(db_adapter, iter_nike_sites(), stats)
+        if not imported_count:
             return JSONResponse(
-                {"success": False, "message": "No data found or error occurred during scraping."},
+                {
+                    "success": False,
+                    "message": "No data found or error occurred during scraping.",
+                    "stats": stats.as_dict(),
+                },
                 status_code=500,
             )
 
-        imported_count = db_adapter.import_sites(sites_data)
         return JSONResponse(
             {
                 "success": True,
                 "message": f"Successfully imported {imported_count} Nike missile sites.",
+                "stats": stats.as_dict(),
             }
         )
     except Exception as exc:
@@ -154,6 +294,63 @@ def clear_data() -> JSONResponse:
         return JSONResponse({"success": False, "error": str(exc)}, status_code=500)
 
 
+@app.get("/api/snapshot")
+def download_snapshot(snapshot_format: str = Query(default="sqlite", alias="format")):
+    if snapshot_format not in SNAPSHOT_SUFFIXES:
+        return JSONResponse(
+            {"success": False, "error": f"Unsupported snapshot format: {snapshot_format}"},
+            status_code=400,
+        )
+
+    suffix = SNAPSHOT_SUFFIXES[snapshot_format]
+    fd, snapshot_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        db_adapter = get_db()
+        db_adapter.initialize()
+        export_snapshot(db_adapter, snapshot_path, snapshot_format)
+    except Exception as exc:
+        os.remove(snapshot_path)
+        logger.error("Error exporting snapshot: %s", exc)
+        return JSONResponse({"success": False, "error": str(exc)}, status_code=500)
+
+    return FileResponse(
+        snapshot_path,
+        media_type="application/gzip",
+        filename=f"nike_sites{suffix}",
+        background=BackgroundTask(os.remove, snapshot_path),
+    )
+
+
+@app.post("/api/snapshot/restore")
+def restore_snapshot_data() -> JSONResponse:
+    snapshot_path = getattr(config, "SNAPSHOT_PATH", "")
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return JSONResponse(
+            {"success": False, "error": "No snapshot configured. Set SNAPSHOT_PATH."},
+            status_code=404,
+        )
+
+    try:
+        db_adapter = get_db()
+        db_adapter.initialize()
+        restored_count = restore_snapshot(db_adapter, snapshot_path)
+        return JSONResponse(
+            {
+                "success": True,
+                "message": f"Successfully restored {restored_count} Nike missile sites from snapshot.",
+            }
+        )
+    except Exception as exc:
+        logger.error("Error restoring snapshot: %s", exc)
+        return JSONResponse({"success": False, "error": str(exc)}, status_code=500)
+
+
+@app.get("/api/admission")
+def admission_stats() -> JSONResponse:
+    return JSONResponse({"success": True, **admission.stats()})
+
+
 if __name__ == "__main__":
     import uvicorn
 
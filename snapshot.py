@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from app.database import SQLiteAdapter, get_db
+from app.snapshot import SNAPSHOT_SUFFIXES, SnapshotError, export_snapshot, restore_snapshot
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def export_command(args):
+    """Export the configured database to a snapshot file"""
+    db_adapter = get_db()
+    db_adapter.initialize()
+    export_snapshot(db_adapter, args.path, args.format)
+    return 0
+
+def restore_command(args):
+    """Restore the configured database from a snapshot file"""
+    db_adapter = get_db()
+    db_adapter.initialize()
+    restore_snapshot(db_adapter, args.path)
+    return 0
+
+def benchmark_command(args):
+    """Time a restore of the current dataset through each snapshot format"""
+    db_adapter = get_db()
+    db_adapter.initialize()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt, suffix in SNAPSHOT_SUFFIXES.items():
+            snapshot_path = os.path.join(tmp_dir, f'snapshot{suffix}')
+            count = export_snapshot(db_adapter, snapshot_path, fmt)
+            size = os.path.getsize(snapshot_path)
+
+            timings = []
+            for i in range(args.repeat):
+                target = SQLiteAdapter(os.path.join(tmp_dir, f'restore-{fmt}-{i}.db'))
+                target.initialize()
+                start = time.perf_counter()
+                restore_snapshot(target, snapshot_path)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            print(f"{fmt}: {count} sites, {size} bytes, "
+                  f"restore best {min(timings):.2f} ms / mean {sum(timings) / len(timings):.2f} ms")
+    return 0
+
+def main():
+    """Parse arguments and run the requested snapshot command"""
+    parser = argparse.ArgumentParser(description="Export, restore and benchmark Nike site snapshots")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Write the dataset to a snapshot")
+    export_parser.add_argument('path', help="Snapshot file (*.db.gz or *.ndjson.gz)")
+    export_parser.add_argument('--format', choices=sorted(SNAPSHOT_SUFFIXES),
+                               help="Snapshot format (default: inferred from the file name)")
+    export_parser.set_defaults(func=export_command)
+
+    restore_parser = subparsers.add_parser('restore', help="Replace the dataset with a snapshot")
+    restore_parser.add_argument('path', help="Snapshot file (*.db.gz or *.ndjson.gz)")
+    restore_parser.set_defaults(func=restore_command)
+
+    benchmark_parser = subparsers.add_parser('benchmark', help="Time both restore paths")
+    benchmark_parser.add_argument('--repeat', type=int, default=5, help="Restores per format")
+    benchmark_parser.set_defaults(func=benchmark_command)
+
+    args = parser.parse_args()
+    try:
+        return args.func(args)
+    except SnapshotError as e:
+        logger.error(f"Snapshot error: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
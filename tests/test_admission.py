@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from app import admission
+from app.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    RoutePolicy,
+    TokenBucket,
+    client_address,
+    parse_trusted_proxies,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission.time, 'monotonic', fake)
+    return fake
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    bucket.consume()
+    bucket.consume()
+
+    assert bucket.retry_after() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.retry_after() == 0
+    clock.now += 10
+    bucket.consume()
+    assert bucket.tokens == pytest.approx(1)
+
+
+def test_heavy_route_rate_limits_per_client_and_route(clock):
+    controller = AdmissionController()
+
+    assert controller.admit('POST', '/api/import-data', 'a') is None
+    status, retry_after, _ = controller.admit('POST', '/api/import-data', 'a')
+    assert status == 429
+    assert retry_after == pytest.approx(300)
+
+    assert controller.admit('POST', '/api/import-data', 'b') is None
+    status, retry_after, _ = controller.admit('POST', '/api/import-data', 'c')
+    assert status == 429
+    assert retry_after == pytest.approx(60)
+
+    counters = controller.stats()['routes']['POST /api/import-data']
+    assert counters == {'admitted': 2, 'rate_limited': 2, 'shed': 0}
+
+
+def test_rejected_request_does_not_spend_tokens(clock):
+    policies = {('POST', '/heavy'): RoutePolicy(route_rate=1, route_burst=1, client_rate=1, client_burst=5)}
+    controller = AdmissionController(policies)
+
+    assert controller.admit('POST', '/heavy', 'a') is None
+    assert controller.admit('POST', '/heavy', 'a')[0] == 429
+    clock.now += 1
+    assert controller.admit('POST', '/heavy', 'a') is None
+
+
+def test_heavy_routes_are_shed_when_busy(clock):
+    controller = AdmissionController()
+
+    controller.heavy_in_flight = 1
+    assert controller.admit('POST', '/api/clear-data', 'a')[0] == 503
+    controller.heavy_in_flight = 0
+
+    controller.reads_in_flight = admission.READ_PRIORITY_THRESHOLD
+    assert controller.admit('POST', '/api/clear-data', 'a')[0] == 503
+    controller.reads_in_flight = 0
+
+    assert controller.admit('POST', '/api/clear-data', 'a') is None
+
+
+def test_reads_are_not_limited_per_client(clock):
+    controller = AdmissionController()
+
+    assert all(controller.admit('GET', '/api/sites', 'proxy') is None for _ in range(500))
+
+
+def test_snapshot_download_does_not_take_heavy_slot():
+    controller = AdmissionController()
+
+    assert not controller.is_heavy('GET', '/api/snapshot')
+    assert controller.is_heavy('POST', '/api/import-data')
+
+
+def test_client_buckets_are_bounded(clock, monkeypatch):
+    monkeypatch.setattr(admission, 'MAX_TRACKED_CLIENTS', 3)
+    controller = AdmissionController()
+
+    for client in 'abcde':
+        controller.admit('POST', '/api/import-data', client)
+    assert controller.stats()['tracked_clients'] == 3
+
+
+def make_scope(peer, forwarded=None, method='GET', path='/api/sites'):
+    headers = [(b'x-forwarded-for', forwarded.encode())] if forwarded else []
+    return {'type': 'http', 'method': method, 'path': path, 'client': (peer, 1234), 'headers': headers}
+
+
+def test_client_address_ignores_forwarded_for_from_untrusted_peer():
+    trusted = parse_trusted_proxies('10.0.0.0/8')
+
+    assert client_address(make_scope('203.0.113.9', '198.51.100.1'), trusted) == '203.0.113.9'
+    assert client_address(make_scope('10.0.0.2', '198.51.100.1'), ()) == '10.0.0.2'
+
+
+def test_client_address_uses_forwarded_for_from_trusted_proxy():
+    trusted = parse_trusted_proxies('10.0.0.0/8, 127.0.0.1')
+
+    scope = make_scope('10.0.0.2', '1.2.3.4, 198.51.100.1, 10.0.0.5')
+    assert client_address(scope, trusted) == '198.51.100.1'
+    assert client_address(make_scope('127.0.0.1'), trusted) == '127.0.0.1'
+
+
+def run_request(middleware, scope):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+def test_middleware_rejects_with_retry_after(clock):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope['path'])
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    controller = AdmissionController()
+    middleware = AdmissionMiddleware(app, controller)
+    scope = make_scope('198.51.100.1', method='POST', path='/api/import-data')
+
+    assert run_request(middleware, scope)[0]['status'] == 200
+    start = run_request(middleware, scope)[0]
+    assert start['status'] == 429
+    assert (b'retry-after', b'300') in start['headers']
+    assert calls == ['/api/import-data']
+    assert controller.heavy_in_flight == 0
+
+
+def test_middleware_releases_slots_when_app_fails(clock):
+    async def app(scope, receive, send):
+        raise RuntimeError('boom')
+
+    controller = AdmissionController()
+    middleware = AdmissionMiddleware(app, controller)
+
+    for scope in (make_scope('a'), make_scope('a', method='POST', path='/api/clear-data')):
+        with pytest.raises(RuntimeError):
+            run_request(middleware, scope)
+
+    assert controller.heavy_in_flight == 0
+    assert controller.reads_in_flight == 0
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+from app.changes import ChangeFeed, change_feed
+from app.database import InMemoryAdapter, SQLiteAdapter
+
+
+def test_changes_since_returns_changes_after_version():
+    feed = ChangeFeed()
+    for site_id in range(3):
+        feed.publish('insert', site_id, {'id': site_id})
+
+    assert [change['version'] for change in feed.changes_since(1)] == [2, 3]
+    assert feed.changes_since(3) == []
+    assert feed.changes_since(0)[0] == {'version': 1, 'op': 'insert', 'id': '0', 'site': {'id': 0}}
+
+
+def test_changes_since_requests_reload_when_cursor_is_unusable():
+    feed = ChangeFeed(max_changes=2)
+    for site_id in range(4):
+        feed.publish('delete', site_id)
+
+    assert feed.changes_since(1) is None
+    assert [change['version'] for change in feed.changes_since(2)] == [3, 4]
+    assert feed.changes_since(5) is None
+    assert feed.changes_since(-1) is None
+    assert feed.changes_since(2, 'another-epoch') is None
+    assert feed.changes_since(2, feed.epoch) is not None
+
+
+def test_wait_times_out_without_changes():
+    feed = ChangeFeed()
+
+    assert asyncio.run(feed.wait(feed.version, 0.01)) is False
+
+
+def test_wait_returns_immediately_when_behind():
+    feed = ChangeFeed()
+    feed.publish('delete', 1)
+
+    assert asyncio.run(feed.wait(0, 1)) is True
+
+
+def test_publish_from_thread_wakes_all_waiters():
+    feed = ChangeFeed()
+
+    async def scenario():
+        waiters = [asyncio.create_task(feed.wait(feed.version, 5)) for _ in range(500)]
+        await asyncio.sleep(0)
+        thread = threading.Thread(target=lambda: [feed.publish('delete', i) for i in range(20)])
+        thread.start()
+        results = await asyncio.gather(*waiters)
+        thread.join()
+        return results
+
+    assert all(asyncio.run(scenario()))
+    assert feed.version == 20
+
+
+def test_feed_survives_event_loop_replacement():
+    feed = ChangeFeed()
+
+    # Bind to a first loop, which asyncio.run closes on exit.
+    assert asyncio.run(feed.wait(feed.version, 0.01)) is False
+
+    # Publishing after that loop closed must not leave a wake stuck pending.
+    feed.publish('delete', 1)
+
+    async def scenario():
+        waiter = asyncio.create_task(feed.wait(feed.version, 5))
+        await asyncio.sleep(0)
+        await asyncio.get_running_loop().run_in_executor(None, feed.publish, 'delete', 2)
+        return await waiter
+
+    assert asyncio.run(scenario()) is True
+    assert asyncio.run(scenario()) is True
+
+
+def test_sqlite_writes_publish_changes(tmp_path):
+    db_adapter = SQLiteAdapter(str(tmp_path / 'sites.db'))
+    db_adapter.initialize()
+    start = change_feed.version
+
+    site_id = db_adapter.add_site({'site_code': 'B-01', 'name': 'Old'})
+    db_adapter.update_site(site_id, {'name': 'New'})
+    db_adapter.update_site(9999, {'name': 'Missing'})
+    db_adapter.delete_site(site_id)
+    db_adapter.import_sites([{'site_code': 'B-02'}])
+
+    changes = change_feed.changes_since(start)
+    assert [change['op'] for change in changes] == ['insert', 'update', 'delete', 'reset']
+    assert changes[0]['site']['site_code'] == 'B-01'
+    assert changes[1]['site']['name'] == 'New'
+    assert changes[2]['id'] == str(site_id)
+
+
+def test_memory_writes_publish_copies():
+    db_adapter = InMemoryAdapter()
+    db_adapter.initialize()
+    db_adapter.import_sites([])
+    start = change_feed.version
+
+    site_id = db_adapter.add_site({'site_code': 'B-01'})
+    db_adapter.update_site(site_id, {'name': 'New'})
+
+    insert, update = change_feed.changes_since(start)
+    assert insert['site'] == {'site_code': 'B-01', 'id': site_id}
+    assert update['site']['name'] == 'New'
@@ -0,0 +1,112 @@
+import requests
+
+from app import scraper
+from app.database import InMemoryAdapter, SQLiteAdapter
+from app.pipeline import PipelineStats, is_valid_site, prefetch, process_sites, run_import
+
+
+def make_site(code='B-01', latitude=41.5, longitude=-73.9, **extra):
+    site = {
+        'site_code': code,
+        'name': f'Site {code}',
+        'state': 'New York',
+        'latitude': latitude,
+        'longitude': longitude,
+        'description': '',
+        'site_type': 'Unknown',
+        'status': 'Unknown',
+        'wiki_url': scraper.WIKI_URL,
+    }
+    site.update(extra)
+    return site
+
+
+def test_is_valid_site_rejects_bad_coordinates():
+    assert is_valid_site(make_site())
+    assert not is_valid_site(make_site(code=''))
+    assert not is_valid_site(make_site(latitude=None))
+    assert not is_valid_site(make_site(latitude=91.0))
+    assert not is_valid_site(make_site(longitude=-181.0))
+    assert not is_valid_site(make_site(latitude='41.5'))
+    assert not is_valid_site(make_site(longitude=True))
+
+
+def test_process_sites_counts_invalid_and_duplicate_rows():
+    stats = PipelineStats()
+    sites = [
+        make_site('B-01'),
+        make_site('b-01'),
+        make_site('B-02', latitude='north'),
+        make_site('B-03'),
+    ]
+
+    accepted = list(process_sites(sites, stats))
+
+    assert [site['site_code'] for site in accepted] == ['B-01', 'B-03']
+    assert stats.as_dict() == {'scraped': 4, 'invalid': 1, 'duplicates': 1, 'accepted': 2}
+
+
+def test_prefetch_preserves_stream():
+    assert prefetch(iter([])) is None
+    assert list(prefetch(iter([1, 2, 3]))) == [1, 2, 3]
+
+
+def test_run_import_batches_into_sqlite(tmp_path):
+    db_adapter = SQLiteAdapter(str(tmp_path / 'sites.db'))
+    db_adapter.initialize()
+    sites = (make_site(f'S-{i}', latitude=40 + i / 1000) for i in range(1203))
+
+    assert run_import(db_adapter, sites) == 1203
+    assert len(db_adapter.get_all_sites()) == 1203
+
+
+def test_run_import_keeps_existing_data_when_stream_is_empty(tmp_path):
+    db_adapter = SQLiteAdapter(str(tmp_path / 'sites.db'))
+    db_adapter.initialize()
+    run_import(db_adapter, [make_site('B-01'), make_site('B-02')])
+
+    assert run_import(db_adapter, [make_site(code='')]) == 0
+    assert len(db_adapter.get_all_sites()) == 2
+
+
+def test_run_import_into_memory():
+    db_adapter = InMemoryAdapter()
+    db_adapter.initialize()
+
+    assert run_import(db_adapter, [make_site('B-01'), make_site('B-02')]) == 2
+    assert [site['id'] for site in db_adapter.get_all_sites()] == ['1', '2']
+
+
+PAGE = '''
+<html><body>
+<div class="navbox"><table><tr><td>Navigation</td><td>x</td><td>y</td></tr></table></div>
+<div class="mw-heading"><h3>New York</h3><span>[edit]</span></div>
+<table class="wikitable">
+<tr><th>Code</th><th>Name</th><th>Location</th></tr>
+<tr><td>NY-01</td><td>Lido Beach</td><td><span class="geo">40.58; -73.62</span></td></tr>
+<tr><td>NY-02</td><td>No coordinates</td><td>unknown</td></tr>
+</table>
+<h3>Denmark</h3>
+<table class="wikitable">
+<tr><th>Code</th><th>Name</th><th>Location</th></tr>
+<tr><td>DK-01</td><td>Stevns</td><td><span class="geo">55.3; 12.4</span></td></tr>
+</table>
+</body></html>
+'''
+
+
+class FakeResponse:
+    text = PAGE
+
+    def raise_for_status(self):
+        pass
+
+
+def test_iter_nike_sites_streams_us_tables(monkeypatch):
+    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: FakeResponse())
+
+    sites = list(scraper.iter_nike_sites())
+
+    assert [(site['site_code'], site['state']) for site in sites] == [('NY-01', 'New York')]
+    assert sites[0]['latitude'] == 40.58
+    assert sites[0]['longitude'] == -73.62
@@ -0,0 +1,161 @@
+import gzip
+import json
+import shutil
+import sqlite3
+
+import pytest
+
+from app.database import InMemoryAdapter, SQLiteAdapter
+from app.snapshot import SnapshotError, export_snapshot, restore_snapshot
+
+
+def make_sites(count):
+    return [
+        {
+            'site_code': f'S-{i}',
+            'name': f'Site {i}',
+            'state': 'New York',
+            'latitude': 40 + i / 100,
+            'longitude': -73.5,
+            'description': 'Launch area',
+            'site_type': 'Unknown',
+            'status': 'Unknown',
+            'wiki_url': 'https://example.org',
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def populated_db(tmp_path):
+    db_adapter = SQLiteAdapter(str(tmp_path / 'live.db'))
+    db_adapter.initialize()
+    db_adapter.import_sites(make_sites(25))
+    return db_adapter
+
+
+def gzip_file(src, dst):
+    with open(src, 'rb') as raw_file, gzip.open(dst, 'wb') as out:
+        shutil.copyfileobj(raw_file, out)
+
+
+@pytest.mark.parametrize('suffix', ['.db.gz', '.ndjson.gz'])
+def test_round_trip_into_sqlite(tmp_path, populated_db, suffix):
+    snapshot_path = str(tmp_path / f'snapshot{suffix}')
+    assert export_snapshot(populated_db, snapshot_path) == 25
+
+    target = SQLiteAdapter(str(tmp_path / 'target.db'))
+    target.initialize()
+    target.import_sites(make_sites(3))
+
+    assert restore_snapshot(target, snapshot_path) == 25
+    restored = sorted(site['site_code'] for site in target.get_all_sites())
+    assert restored == sorted(site['site_code'] for site in make_sites(25))
+
+
+@pytest.mark.parametrize('suffix', ['.db.gz', '.ndjson.gz'])
+def test_round_trip_into_memory(tmp_path, populated_db, suffix):
+    snapshot_path = str(tmp_path / f'snapshot{suffix}')
+    export_snapshot(populated_db, snapshot_path)
+
+    target = InMemoryAdapter()
+    target.initialize()
+
+    assert restore_snapshot(target, snapshot_path) == 25
+    assert len(target.get_all_sites()) == 25
+
+
+def test_sqlite_restore_keeps_ids(tmp_path, populated_db):
+    snapshot_path = str(tmp_path / 'snapshot.db.gz')
+    export_snapshot(populated_db, snapshot_path)
+    target = SQLiteAdapter(str(tmp_path / 'target.db'))
+    target.initialize()
+
+    restore_snapshot(target, snapshot_path)
+
+    assert {site['id'] for site in target.get_all_sites()} == {site['id'] for site in populated_db.get_all_sites()}
+
+
+def test_unrecognized_file_name(tmp_path, populated_db):
+    with pytest.raises(SnapshotError):
+        restore_snapshot(populated_db, str(tmp_path / 'snapshot.txt'))
+
+
+def test_sqlite_version_mismatch(tmp_path, populated_db):
+    raw_path = tmp_path / 'old.db'
+    conn = sqlite3.connect(raw_path)
+    conn.execute('PRAGMA user_version = 99')
+    conn.close()
+    gzip_file(raw_path, tmp_path / 'old.db.gz')
+
+    with pytest.raises(SnapshotError, match='version'):
+        restore_snapshot(populated_db, str(tmp_path / 'old.db.gz'))
+    assert len(populated_db.get_all_sites()) == 25
+
+
+def test_sqlite_restore_rejects_foreign_database(tmp_path, populated_db):
+    raw_path = tmp_path / 'foreign.db'
+    conn = sqlite3.connect(raw_path)
+    conn.execute('CREATE TABLE foo (x INTEGER)')
+    conn.execute('PRAGMA user_version = 1')
+    conn.commit()
+    conn.close()
+    gzip_file(raw_path, tmp_path / 'foreign.db.gz')
+
+    with pytest.raises(SnapshotError, match='missing nike_sites columns'):
+        restore_snapshot(populated_db, str(tmp_path / 'foreign.db.gz'))
+
+    assert len(populated_db.get_all_sites()) == 25
+
+
+def test_corrupt_sqlite_snapshot(tmp_path, populated_db):
+    snapshot_path = tmp_path / 'corrupt.db.gz'
+    with gzip.open(snapshot_path, 'wb') as out:
+        out.write(b'this is not a database' * 100)
+
+    with pytest.raises(SnapshotError):
+        restore_snapshot(populated_db, str(snapshot_path))
+    assert len(populated_db.get_all_sites()) == 25
+
+
+def test_corrupt_gzip(tmp_path, populated_db):
+    snapshot_path = tmp_path / 'corrupt.ndjson.gz'
+    snapshot_path.write_bytes(b'not gzip')
+
+    with pytest.raises(SnapshotError):
+        restore_snapshot(populated_db, str(snapshot_path))
+
+
+def test_bad_ndjson_line_rolls_back(tmp_path, populated_db):
+    snapshot_path = str(tmp_path / 'snapshot.ndjson.gz')
+    export_snapshot(populated_db, snapshot_path)
+    with gzip.open(snapshot_path, 'at', encoding='utf-8') as out:
+        out.write('{"site_code": \n')
+
+    target = SQLiteAdapter(str(tmp_path / 'target.db'))
+    target.initialize()
+    target.import_sites(make_sites(3))
+
+    with pytest.raises(SnapshotError):
+        restore_snapshot(target, snapshot_path)
+    assert len(target.get_all_sites()) == 3
+
+
+def test_ndjson_header_checks(tmp_path, populated_db):
+    snapshot_path = tmp_path / 'snapshot.ndjson.gz'
+    with gzip.open(snapshot_path, 'wt', encoding='utf-8') as out:
+        out.write(json.dumps({'format': 'nike-sites', 'version': 99}) + '\n')
+
+    with pytest.raises(SnapshotError, match='version'):
+        restore_snapshot(populated_db, str(snapshot_path))
+
+
+def test_startup_snapshot_falls_back_on_corrupt_file(tmp_path, monkeypatch, populated_db):
+    import main
+
+    snapshot_path = tmp_path / 'corrupt.db.gz'
+    with gzip.open(snapshot_path, 'wb') as out:
+        out.write(b'garbage' * 100)
+    monkeypatch.setattr(main.config, 'SNAPSHOT_PATH', str(snapshot_path))
+
+    assert main.restore_configured_snapshot(populated_db) == 0
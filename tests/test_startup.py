@@ -0,0 +1,23 @@
+import pytest
+
+from check_startup import STARTUP_BUDGET_MS, app_import_cost, eager_modules, measure_import
+
+
+@pytest.fixture(scope='module')
+def samples():
+    return [measure_import('main') for _ in range(3)]
+
+
+def test_main_does_not_import_scraper_stack(samples):
+    for timings in samples:
+        assert eager_modules(timings) == []
+
+
+def test_main_import_within_budget(samples):
+    assert min(app_import_cost(timings) for timings in samples) <= STARTUP_BUDGET_MS
+
+
+def test_measure_import_rejects_preloaded_module():
+    # sys is built in, so importtime never reports it.
+    with pytest.raises(RuntimeError, match='not imported'):
+        measure_import('sys')